@@ -2,10 +2,14 @@ from flask import Flask
 from flask_session import Session
 from flask_migrate import Migrate
 from configs import config
-import redis
+from commands import register_commands
 
+from extensions import ext_profiling, ext_warmup
 from extensions.ext_db import db
+from extensions.ext_redis import redis_client
 from controllers.auth.auth import auth_bp
+from controllers.user.avatar import avatar_bp
+from controllers.user.user import user_bp
 
 
 session = Session()
@@ -17,14 +21,22 @@ def create_app():
     app.config.from_mapping(config.model_dump())
 
     db.init_app(app)
+    redis_client.init_app(app)
 
     app.config["SESSION_TYPE"] = "redis"
-    app.config["SESSION_REDIS"] = redis.from_url(app.config["REDIS_URL"])
+    app.config["SESSION_REDIS"] = redis_client.client
     session.init_app(app)
 
     migrate.init_app(app, db)
 
     app.register_blueprint(auth_bp, url_prefix="/api/auth")
+    app.register_blueprint(user_bp, url_prefix="/api/users")
+    app.register_blueprint(avatar_bp, url_prefix="/api/avatars")
+
+    register_commands(app)
+
+    ext_profiling.init_app(app)
+    ext_warmup.init_app(app)
 
     return app
 
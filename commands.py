@@ -0,0 +1,137 @@
+import statistics
+import time
+
+import click
+from flask import Flask, current_app
+from sqlalchemy import text
+
+from extensions.ext_db import db
+from models.user import User
+from services.auth.token_refresh import TokenRefreshService
+from services.user.avatar import AvatarService
+from services.user.user import UserService
+
+BENCH_EMAIL_DOMAIN = 'bench.invalid'
+
+
+def _timed(func, iterations: int) -> dict:
+    costs = []
+    for _ in range(iterations):
+        started = time.perf_counter()
+        func()
+        costs.append((time.perf_counter() - started) * 1000)
+    costs.sort()
+    return {
+        'p50': statistics.median(costs),
+        'p95': costs[min(len(costs) - 1, int(len(costs) * 0.95))],
+        'max': costs[-1],
+    }
+
+
+@click.command('bench-user-search')
+@click.option('--users', default=1_000_000, show_default=True, help='Number of seeded users.')
+@click.option('--iterations', default=50, show_default=True, help='Iterations per scenario.')
+@click.option('--pages', default=50, show_default=True, help='Page depth for the pagination scenarios.')
+@click.option('--seed/--no-seed', default=True, show_default=True, help='Seed the benchmark dataset first.')
+@click.option('--cleanup', is_flag=True, help='Delete the benchmark dataset afterwards.')
+@click.confirmation_option(prompt='This inserts benchmark rows into the users table. Continue?')
+def bench_user_search(users: int, iterations: int, pages: int, seed: bool, cleanup: bool):
+    """Benchmark user search against a seeded dataset."""
+    if seed:
+        click.echo(f'Seeding {users} users ...')
+        started = time.perf_counter()
+        db.session.execute(text(
+            "INSERT INTO users (username, email, is_active, created_at, updated_at) "
+            "SELECT 'bench_' || substr(md5(g::text), 1, 12), "
+            "       'bench' || g || '@" + BENCH_EMAIL_DOMAIN + "', "
+            "       true, now() - (g || ' seconds')::interval, now() "
+            "FROM generate_series(1, :users) AS g"
+        ), {'users': users})
+        db.session.commit()
+        db.session.execute(text('ANALYZE users'))
+        db.session.commit()
+        click.echo(f'Seeded in {time.perf_counter() - started:.1f}s')
+
+    limit = 20
+
+    def walk_keyset(query):
+        after = None
+        for _ in range(pages):
+            page, has_more = UserService.search_users(query, limit, after)
+            if not has_more:
+                break
+            after = (page[-1].created_at, page[-1].id)
+
+    def walk_offset():
+        # 对照组：传统 OFFSET 分页翻到相同深度
+        db.session.execute(
+            text('SELECT id FROM users ORDER BY created_at DESC, id DESC LIMIT :limit OFFSET :offset'),
+            {'limit': limit, 'offset': limit * pages},
+        ).all()
+
+    scenarios = {
+        'search "a1b2" first page': lambda: UserService.search_users('a1b2', limit),
+        'search "bench_0" first page': lambda: UserService.search_users('bench_0', limit),
+        'search "zzzqx" (no match)': lambda: UserService.search_users('zzzqx', limit),
+        f'list keyset {pages} pages': lambda: walk_keyset(None),
+        f'search "abc" keyset {pages} pages': lambda: walk_keyset('abc'),
+        f'list OFFSET page {pages}': walk_offset,
+    }
+    for name, scenario in scenarios.items():
+        result = _timed(scenario, iterations)
+        db.session.rollback()
+        click.echo(f"{name:<36} p50={result['p50']:8.2f}ms p95={result['p95']:8.2f}ms max={result['max']:8.2f}ms")
+
+    plan = db.session.execute(text(
+        "EXPLAIN ANALYZE SELECT id FROM users WHERE username ILIKE '%a1b2%' "
+        "ORDER BY created_at DESC, id DESC LIMIT 21"
+    )).scalars().all()
+    click.echo('\n'.join(plan))
+
+    if cleanup:
+        db.session.execute(text(f"DELETE FROM users WHERE email LIKE '%@{BENCH_EMAIL_DOMAIN}'"))
+        db.session.commit()
+        click.echo('Benchmark dataset removed')
+
+
+@click.command('refresh-tokens')
+@click.option('--once', is_flag=True, help='Run a single refresh pass and exit.')
+def refresh_tokens(once: bool):
+    """Refresh OAuth access tokens before they expire."""
+    if once:
+        refreshed = TokenRefreshService.run_once()
+        if refreshed is None:
+            click.echo('Another scheduler holds the lock, skipped')
+        else:
+            click.echo(f'Refreshed {refreshed} tokens')
+        return
+    TokenRefreshService.run_forever()
+
+
+@click.command('backfill-avatars')
+@click.option('--batch-size', default=100, show_default=True, help='Users loaded per query.')
+def backfill_avatars(batch_size: int):
+    """Cache avatars of users that have no local thumbnails yet."""
+    app = current_app._get_current_object()
+    last_id, total = 0, 0
+    while True:
+        # 按主键游标分页，抓取失败的用户不会被反复选中
+        users = db.session.query(User.id, User.avatar_url).filter(
+            User.id > last_id,
+            User.avatar_url.isnot(None),
+            User.avatar_hash.is_(None),
+        ).order_by(User.id).limit(batch_size).all()
+        db.session.rollback()
+        if not users:
+            break
+        for user_id, avatar_url in users:
+            AvatarService.process(app, user_id, avatar_url)
+        last_id = users[-1].id
+        total += len(users)
+        click.echo(f'Processed {total} users (id <= {last_id})')
+
+
+def register_commands(app: Flask):
+    app.cli.add_command(bench_user_search)
+    app.cli.add_command(refresh_tokens)
+    app.cli.add_command(backfill_avatars)
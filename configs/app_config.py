@@ -2,12 +2,14 @@ from pydantic_settings import SettingsConfigDict
 from pydantic import Field
 
 from .auth import AuthConfig
+from .feature import FeatureConfig
 from .middleware.redis import RedisConfig
 from .middleware.database import DatabaseConfig
 
 
 class AppConfig(
     AuthConfig,
+    FeatureConfig,
     RedisConfig,
     DatabaseConfig,
     ):
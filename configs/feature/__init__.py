@@ -0,0 +1,15 @@
+from .avatar import AvatarConfig
+from .profiling import ProfilingConfig
+from .token_refresh import TokenRefreshConfig
+from .user import UserConfig
+from .warmup import WarmupConfig
+
+
+class FeatureConfig(
+    AvatarConfig,
+    ProfilingConfig,
+    TokenRefreshConfig,
+    UserConfig,
+    WarmupConfig,
+    ):
+    pass
@@ -0,0 +1,43 @@
+from typing import List
+
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+class AvatarConfig(BaseSettings):
+    AVATAR_CACHE_ENABLED: bool = Field(
+        default=True,
+        description="Fetch provider avatars and serve local thumbnails",
+    )
+    AVATAR_STORAGE_DIR: str = Field(
+        default="storage/avatars",
+        description="Directory for content-addressed avatar thumbnails",
+    )
+    AVATAR_SIZES: List[int] = Field(
+        default=[40, 96, 256],
+        description="Square thumbnail sizes in pixels, e.g. [40,96,256]",
+    )
+    AVATAR_ALLOWED_HOSTS: List[str] = Field(
+        default=["avatars.githubusercontent.com"],
+        description="Hosts avatars may be fetched from",
+    )
+    AVATAR_FETCH_TIMEOUT: float = Field(
+        default=5.0,
+        description="Timeout in seconds for fetching an avatar",
+    )
+    AVATAR_MAX_BYTES: int = Field(
+        default=5 * 1024 * 1024,
+        description="Maximum size in bytes of a fetched avatar",
+    )
+    AVATAR_MAX_PIXELS: int = Field(
+        default=4096 * 4096,
+        description="Maximum width * height of a fetched avatar, checked before decoding",
+    )
+    AVATAR_FETCH_WORKERS: int = Field(
+        default=2,
+        description="Number of background threads fetching avatars",
+    )
+    AVATAR_X_ACCEL_PREFIX: str = Field(
+        default="",
+        description="If set, delegate thumbnail transfer to nginx via X-Accel-Redirect under this internal location",
+    )
@@ -0,0 +1,33 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+class ProfilingConfig(BaseSettings):
+    PROFILING_ENABLED: bool = Field(
+        default=False,
+        description="Install request profiling hooks; when disabled no hooks are installed at all",
+    )
+    PROFILING_TOKEN: str = Field(
+        default="",
+        description="Admin token; requests carrying it in the X-Profile-Token header are profiled",
+    )
+    PROFILING_SAMPLE_RATE: float = Field(
+        default=0.0,
+        description="Fraction of requests (0.0 - 1.0) profiled without the admin header",
+    )
+    PROFILING_OUTPUT_DIR: str = Field(
+        default="profiles",
+        description="Directory for compressed profile and timeline files",
+    )
+    PROFILING_SAMPLER_ENABLED: bool = Field(
+        default=False,
+        description="Enable the low-overhead stack sampler aggregating hot stacks per endpoint",
+    )
+    PROFILING_SAMPLER_INTERVAL_MS: int = Field(
+        default=10,
+        description="Stack sampler interval in milliseconds",
+    )
+    PROFILING_SAMPLER_WINDOW: int = Field(
+        default=60,
+        description="Seconds of samples aggregated into each stack sampler output file",
+    )
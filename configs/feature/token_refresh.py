@@ -0,0 +1,29 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+class TokenRefreshConfig(BaseSettings):
+    TOKEN_REFRESH_AHEAD: int = Field(
+        default=900,
+        description="Refresh OAuth access tokens expiring within this many seconds",
+    )
+    TOKEN_REFRESH_BATCH_SIZE: int = Field(
+        default=200,
+        description="Number of accounts loaded and written back per batch",
+    )
+    TOKEN_REFRESH_WORKERS: int = Field(
+        default=4,
+        description="Number of concurrent refresh requests to the provider",
+    )
+    TOKEN_REFRESH_RATE_LIMIT: float = Field(
+        default=10.0,
+        description="Maximum refresh requests per second sent to the provider",
+    )
+    TOKEN_REFRESH_INTERVAL: int = Field(
+        default=60,
+        description="Seconds between scheduler runs",
+    )
+    TOKEN_REFRESH_MAX_OVERDUE: int = Field(
+        default=86400,
+        description="Skip accounts whose token expired longer ago than this many seconds; they refresh lazily on use",
+    )
@@ -0,0 +1,21 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+class UserConfig(BaseSettings):
+    USER_BATCH_MAX_IDS: int = Field(
+        default=200,
+        description="Maximum number of user ids resolved by one batch lookup request",
+    )
+    USER_SEARCH_DEFAULT_LIMIT: int = Field(
+        default=20,
+        description="Default page size of the user search/list endpoint",
+    )
+    USER_SEARCH_MAX_LIMIT: int = Field(
+        default=100,
+        description="Maximum page size of the user search/list endpoint",
+    )
+    USER_SEARCH_MIN_QUERY_LENGTH: int = Field(
+        default=3,
+        description="Minimum search term length; shorter terms cannot use the trigram index",
+    )
@@ -0,0 +1,25 @@
+from pydantic import Field
+from pydantic_settings import BaseSettings
+
+
+class WarmupConfig(BaseSettings):
+    WARMUP_ENABLED: bool = Field(
+        default=False,
+        description="Enable connection warmup when the app (worker) boots",
+    )
+    WARMUP_DB_CONNECTIONS: int = Field(
+        default=2,
+        description="Number of database pool connections to pre-open",
+    )
+    WARMUP_REDIS_CONNECTIONS: int = Field(
+        default=2,
+        description="Number of Redis pool connections to pre-open",
+    )
+    WARMUP_HTTP_ENABLED: bool = Field(
+        default=True,
+        description="Pre-resolve and open TLS connections to OAuth provider endpoints",
+    )
+    WARMUP_HTTP_TIMEOUT: float = Field(
+        default=3.0,
+        description="Timeout in seconds for each provider endpoint warmup request",
+    )
@@ -59,6 +59,11 @@ class DatabaseConfig(BaseSettings):
         description="Maximum number of connections to create beyond the pool size",
     )
 
+    MIGRATION_LOCK_TIMEOUT: int = Field(
+        default=5000,
+        description="lock_timeout in milliseconds applied to migrations; 0 disables the guard",
+    )
+
     @computed_field
     def SQLALCHEMY_DATABASE_URI(self) -> str:
         extra_params = (
@@ -0,0 +1,50 @@
+import os
+import re
+from flask import Blueprint, current_app, make_response, send_file
+from flask_restful import Api, Resource
+from services.user.avatar import AvatarService
+
+avatar_bp = Blueprint("avatar", __name__)
+api = Api(avatar_bp)
+
+AVATAR_HASH_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+# 内容寻址的文件永远不会变化，可以让浏览器和CDN长期缓存
+AVATAR_MAX_AGE = 365 * 24 * 3600
+
+class AvatarResource(Resource):
+    """头像缩略图资源"""
+    
+    def get(self, avatar_hash: str, size: int):
+        if not AVATAR_HASH_PATTERN.match(avatar_hash) or size not in current_app.config['AVATAR_SIZES']:
+            return {'success': False, 'message': '头像不存在'}, 404
+        
+        storage_dir = current_app.config['AVATAR_STORAGE_DIR']
+        path = AvatarService.thumbnail_path(storage_dir, avatar_hash, size)
+        if not os.path.isfile(path):
+            return {'success': False, 'message': '头像不存在'}, 404
+        
+        x_accel_prefix = current_app.config['AVATAR_X_ACCEL_PREFIX']
+        if x_accel_prefix:
+            # 交给nginx直接发送文件
+            response = make_response('')
+            response.headers['X-Accel-Redirect'] = (
+                f"{x_accel_prefix.rstrip('/')}/{os.path.relpath(path, storage_dir)}"
+            )
+            response.mimetype = 'image/webp'
+        else:
+            # send_file使用wsgi.file_wrapper，gunicorn等服务器会走sendfile零拷贝发送
+            response = send_file(
+                os.path.abspath(path),
+                mimetype='image/webp',
+                etag=f'{avatar_hash}-{size}',
+                conditional=True,
+                max_age=AVATAR_MAX_AGE,
+            )
+        
+        response.cache_control.public = True
+        response.cache_control.max_age = AVATAR_MAX_AGE
+        response.cache_control.immutable = True
+        return response
+
+
+api.add_resource(AvatarResource, "/<string:avatar_hash>/<int:size>")
@@ -0,0 +1,78 @@
+from flask import Blueprint, request, current_app
+from flask_restful import Api, Resource
+from pydantic import ValidationError
+from schemas.user.user import PublicUserProfile, UserBatchRequest, UserBatchResponse, UserSearchRequest, UserSearchResponse
+from services.user.user import UserService
+from utils.pagination import encode_cursor, decode_cursor
+
+user_bp = Blueprint("user", __name__)
+api = Api(user_bp)
+
+class UserListResource(Resource):
+    """用户搜索/列表资源"""
+    
+    def get(self):
+        if not UserService.get_current_user():
+            return {'success': False, 'message': '未登录'}, 401
+        
+        try:
+            # 验证请求数据
+            search_data = UserSearchRequest(**request.args.to_dict())
+        except ValidationError as e:
+            return {'success': False, 'message': '参数错误', 'errors': e.errors()}, 400
+        
+        query = (search_data.q or '').strip()
+        min_length = current_app.config['USER_SEARCH_MIN_QUERY_LENGTH']
+        if query and len(query) < min_length:
+            return {'success': False, 'message': f'搜索关键词至少{min_length}个字符'}, 400
+        
+        try:
+            after = decode_cursor(search_data.cursor) if search_data.cursor else None
+        except ValueError:
+            return {'success': False, 'message': '无效的分页游标'}, 400
+        
+        limit = min(
+            search_data.limit or current_app.config['USER_SEARCH_DEFAULT_LIMIT'],
+            current_app.config['USER_SEARCH_MAX_LIMIT'],
+        )
+        users, has_more = UserService.search_users(query, limit, after)
+        
+        next_cursor = encode_cursor(users[-1].created_at, users[-1].id) if has_more else None
+        response = UserSearchResponse(
+            success=True,
+            users=[PublicUserProfile(**user.to_dict()) for user in users],
+            next_cursor=next_cursor,
+        )
+        return response.model_dump()
+
+class UserBatchResource(Resource):
+    """批量用户资料资源"""
+    
+    def get(self):
+        if not UserService.get_current_user():
+            return {'success': False, 'message': '未登录'}, 401
+        
+        try:
+            # 验证请求数据
+            batch_data = UserBatchRequest(ids=request.args.get('ids', ''))
+        except ValidationError as e:
+            return {'success': False, 'message': '参数错误', 'errors': e.errors()}, 400
+        
+        max_ids = current_app.config['USER_BATCH_MAX_IDS']
+        if len(batch_data.ids) > max_ids:
+            return {'success': False, 'message': f'单次最多查询{max_ids}个用户'}, 400
+        
+        users = UserService.get_users_by_ids(batch_data.ids)
+        # 已停用的用户与不存在的用户一样报告为missing
+        found = {user_id: user for user_id, user in users.items() if user and user.is_active}
+        
+        response = UserBatchResponse(
+            success=True,
+            users={user_id: PublicUserProfile(**user.to_dict()) for user_id, user in found.items()},
+            missing=[user_id for user_id in users if user_id not in found],
+        )
+        return response.model_dump()
+
+
+api.add_resource(UserListResource, "")
+api.add_resource(UserBatchResource, "/batch")
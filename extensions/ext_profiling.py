@@ -0,0 +1,114 @@
+import hmac
+import random
+import time
+
+import requests
+from flask import Flask, g, request
+from sqlalchemy import event
+
+from extensions.ext_db import db
+from extensions.ext_redis import redis_client
+from libs.profiling import RequestProfiler, StackSampler, record_event
+
+PROFILE_HEADER = 'X-Profile-Token'
+PROFILE_ID_HEADER = 'X-Profile-Id'
+
+
+def _install_sql_hooks(app: Flask):
+    with app.app_context():
+        engine = db.engine
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._profiling_started = time.perf_counter()
+
+    @event.listens_for(engine, 'after_cursor_execute')
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        started = context._profiling_started
+        record_event('sql', statement, started, time.perf_counter() - started)
+
+
+def _install_redis_hooks():
+    client = redis_client.client
+    execute_command = client.execute_command
+
+    def profiled_execute_command(*args, **options):
+        started = time.perf_counter()
+        try:
+            return execute_command(*args, **options)
+        finally:
+            record_event('redis', str(args[0]) if args else '', started, time.perf_counter() - started)
+
+    client.execute_command = profiled_execute_command
+
+
+def _install_http_hooks():
+    send = requests.Session.send
+
+    def profiled_send(self, req, **kwargs):
+        started = time.perf_counter()
+        try:
+            return send(self, req, **kwargs)
+        finally:
+            record_event('http', f'{req.method} {req.url}', started, time.perf_counter() - started)
+
+    requests.Session.send = profiled_send
+
+
+def _should_profile(app: Flask) -> bool:
+    token = app.config['PROFILING_TOKEN']
+    header = request.headers.get(PROFILE_HEADER)
+    if token and header and hmac.compare_digest(header, token):
+        return True
+    sample_rate = app.config['PROFILING_SAMPLE_RATE']
+    return sample_rate > 0 and random.random() < sample_rate
+
+
+def init_app(app: Flask):
+    """安装请求分析钩子；PROFILING_ENABLED关闭时什么都不安装，不产生任何开销"""
+    if not app.config['PROFILING_ENABLED']:
+        return
+
+    _install_sql_hooks(app)
+    _install_redis_hooks()
+    _install_http_hooks()
+
+    output_dir = app.config['PROFILING_OUTPUT_DIR']
+    sampler = None
+    if app.config['PROFILING_SAMPLER_ENABLED']:
+        sampler = StackSampler(
+            output_dir,
+            interval=app.config['PROFILING_SAMPLER_INTERVAL_MS'] / 1000,
+            window=app.config['PROFILING_SAMPLER_WINDOW'],
+        )
+
+    @app.before_request
+    def start_profiling():
+        if sampler is not None:
+            sampler.ensure_started()
+            sampler.enter(request.endpoint)
+        if _should_profile(app):
+            profiler = RequestProfiler(request.endpoint)
+            if profiler.start():
+                g.profiler = profiler
+
+    @app.after_request
+    def dump_profile(response):
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.stop()
+            try:
+                profiler.dump(output_dir, method=request.method, path=request.path, status=response.status_code)
+                response.headers[PROFILE_ID_HEADER] = profiler.id
+            except Exception as e:
+                app.logger.warning(f'写入请求分析结果失败: {str(e)}')
+        return response
+
+    @app.teardown_request
+    def stop_profiling(exc):
+        # 请求异常时after_request不会执行，这里保证分析器被停止
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profiler.stop()
+        if sampler is not None:
+            sampler.exit()
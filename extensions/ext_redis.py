@@ -0,0 +1,25 @@
+import redis
+from flask import Flask
+
+
+class RedisClientWrapper:
+    """延迟初始化的Redis客户端，在init_app之后代理到真实客户端"""
+
+    def __init__(self):
+        self._client: redis.Redis | None = None
+
+    def init_app(self, app: Flask):
+        self._client = redis.from_url(app.config["REDIS_URL"], password=app.config.get("REDIS_PASSWORD"))
+        app.extensions["redis"] = self._client
+
+    @property
+    def client(self) -> redis.Redis:
+        if self._client is None:
+            raise RuntimeError("Redis client is not initialized, call init_app first")
+        return self._client
+
+    def __getattr__(self, item):
+        return getattr(self.client, item)
+
+
+redis_client = RedisClientWrapper()
@@ -0,0 +1,112 @@
+import os
+import time
+from typing import Callable, Dict
+
+from flask import Flask
+
+from extensions.ext_db import db
+from extensions.ext_redis import redis_client
+
+
+def _warmup_db(app: Flask):
+    """预先打开数据库连接池中的连接"""
+    # 同时持有多个连接，确保连接池中真正建立了N个连接而不是复用同一个
+    connections = [db.engine.connect() for _ in range(app.config["WARMUP_DB_CONNECTIONS"])]
+    try:
+        for connection in connections:
+            connection.exec_driver_sql("SELECT 1")
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+def _warmup_redis(app: Flask):
+    """预先打开Redis连接池中的连接"""
+    pool = redis_client.connection_pool
+    connections = [pool.get_connection() for _ in range(app.config["WARMUP_REDIS_CONNECTIONS"])]
+    try:
+        for connection in connections:
+            connection.send_command("PING")
+            connection.read_response()
+    finally:
+        for connection in connections:
+            pool.release(connection)
+
+
+def _warmup_providers(app: Flask):
+    """构建认证提供商注册表，并预先解析/握手提供商端点"""
+    from services.auth.auth_manager import AuthManager
+
+    auth_manager = AuthManager()
+    if not app.config["WARMUP_HTTP_ENABLED"]:
+        return
+    for provider in auth_manager.get_all_providers():
+        provider.warmup(app.config["WARMUP_HTTP_TIMEOUT"])
+
+
+def _warmup_schemas(app: Flask):
+    """让请求/响应模型各走一遍校验和序列化"""
+    from datetime import datetime, timezone
+    from schemas.auth.auth import AuthResponse, UserProfile
+
+    user = UserProfile(
+        id=0,
+        email=None,
+        username="warmup",
+        avatar_url=None,
+        is_active=True,
+        created_at=datetime.now(timezone.utc),
+    )
+    AuthResponse(success=True, user=user, message="").model_dump()
+
+
+WARMUP_STEPS: Dict[str, Callable[[Flask], None]] = {
+    "db": _warmup_db,
+    "redis": _warmup_redis,
+    "providers": _warmup_providers,
+    "schemas": _warmup_schemas,
+}
+
+
+def warmup(app: Flask) -> Dict[str, float]:
+    """执行预热，返回各步骤耗时（秒）。单个步骤失败只记录日志，不影响启动"""
+    timings: Dict[str, float] = {}
+    started = time.perf_counter()
+    with app.app_context():
+        for name, step in WARMUP_STEPS.items():
+            step_started = time.perf_counter()
+            try:
+                step(app)
+            except Exception as e:
+                app.logger.warning(f"Warmup step '{name}' failed: {str(e)}")
+            timings[name] = time.perf_counter() - step_started
+    timings["total"] = time.perf_counter() - started
+
+    app.extensions["warmup"] = timings
+    app.logger.info(
+        f"Warmup finished in {timings['total'] * 1000:.1f}ms (pid={os.getpid()}): "
+        + ", ".join(f"{name}={cost * 1000:.1f}ms" for name, cost in timings.items() if name != "total")
+    )
+    return timings
+
+
+def _after_fork(app: Flask):
+    """子进程中丢弃从父进程继承的连接，然后重新预热"""
+    with app.app_context():
+        db.engine.dispose(close=False)
+    # 提供商的requests.Session（urllib3连接池）不检查pid，继续使用会与父进程及其他worker
+    # 共享同一个TLS连接；直接丢弃注册表，由子进程重建自己的提供商实例和连接池
+    app.extensions.pop("auth_providers", None)
+    warmup(app)
+
+
+def init_app(app: Flask):
+    if not app.config["WARMUP_ENABLED"]:
+        return
+    # flask db upgrade、flask refresh-tokens等命令行运行不需要预热
+    if os.environ.get("FLASK_RUN_FROM_CLI") == "true":
+        return
+    warmup(app)
+    # 使用preload的预fork服务器（如gunicorn --preload）会在父进程中创建应用，
+    # 这里保证每个fork出来的worker都拿到属于自己的热连接
+    os.register_at_fork(after_in_child=lambda: _after_fork(app))
@@ -0,0 +1,150 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+
+import sqlalchemy as sa
+from alembic import context, op
+
+logger = logging.getLogger('alembic.online')
+
+BACKFILL_PROGRESS_TABLE = 'alembic_backfill_progress'
+
+
+@contextmanager
+def lock_timeout(timeout_ms: int):
+    """在代码块内临时设置lock_timeout，拿不到锁时快速失败而不是阻塞其他查询"""
+    if context.is_offline_mode():
+        # --sql模式下无法读取当前值，直接输出SET/RESET语句
+        op.execute(f"SET lock_timeout = '{int(timeout_ms)}ms'")
+        try:
+            yield
+        finally:
+            op.execute('RESET lock_timeout')
+        return
+
+    bind = op.get_bind()
+    previous = bind.exec_driver_sql('SHOW lock_timeout').scalar()
+    bind.exec_driver_sql(f"SET lock_timeout = '{int(timeout_ms)}ms'")
+    try:
+        yield
+    finally:
+        bind.exec_driver_sql(f"SET lock_timeout = '{previous}'")
+
+
+def _drop_invalid_index(index_name: str):
+    """CREATE INDEX CONCURRENTLY 失败会留下无效索引，重试前先清理"""
+    if context.is_offline_mode():
+        # --sql模式下无法查询pg_index，生成的脚本假定没有遗留的无效索引
+        return
+    invalid = op.get_bind().execute(sa.text(
+        "SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relname = :name AND NOT i.indisvalid"
+    ), {'name': index_name}).scalar()
+    if invalid:
+        logger.info(f'Dropping invalid index {index_name} left by a previous attempt')
+        op.drop_index(index_name, postgresql_concurrently=True, if_exists=True)
+
+
+def create_index_concurrently(index_name: str, table_name: str, columns: List[str], timeout_ms: int = 0, **kw):
+    """在事务之外用 CREATE INDEX CONCURRENTLY 建索引，不阻塞表的读写
+
+    并发建索引需要等待更早的事务结束，这种等待不会阻塞DML，因此默认不受
+    env.py 中全局lock_timeout的限制（timeout_ms=0），否则遇到长事务就会失败并留下无效索引
+    """
+    with op.get_context().autocommit_block(), lock_timeout(timeout_ms):
+        _drop_invalid_index(index_name)
+        op.create_index(index_name, table_name, columns, postgresql_concurrently=True, if_not_exists=True, **kw)
+
+
+def drop_index_concurrently(index_name: str, table_name: str, timeout_ms: int = 0):
+    """在事务之外用 DROP INDEX CONCURRENTLY 删除索引，lock_timeout的处理同 create_index_concurrently"""
+    with op.get_context().autocommit_block(), lock_timeout(timeout_ms):
+        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+
+
+def _ensure_progress_table(bind):
+    bind.exec_driver_sql(
+        f'CREATE TABLE IF NOT EXISTS {BACKFILL_PROGRESS_TABLE} ('
+        'name VARCHAR(128) PRIMARY KEY, last_id BIGINT NOT NULL, updated_at TIMESTAMP NOT NULL DEFAULT now())'
+    )
+
+
+def batched_backfill(
+    name: str,
+    table_name: str,
+    set_clause: str,
+    where_clause: Optional[str] = None,
+    batch_size: int = 1000,
+    sleep: float = 0.1,
+    key: str = 'id',
+    batch_lock_timeout_ms: int = 2000,
+):
+    """按主键区间分批回填数据，每批单独提交
+
+    - 进度记录在 alembic_backfill_progress 表中，中断后重新执行迁移会从上次的位置继续
+    - 每批之间休眠 sleep 秒，给线上流量和复制留出余量
+    - 每批设置lock_timeout，遇到长时间持有的行锁时失败而不是排队阻塞
+    - 重新执行的批次可能被处理两次，set_clause/where_clause 需要是幂等的
+
+    例如::
+
+        batched_backfill(
+            'oauth_accounts_token_expires_at',
+            'oauth_accounts',
+            "token_expires_at = created_at + interval '8 hours'",
+            where_clause='token_expires_at IS NULL AND refresh_token IS NOT NULL',
+        )
+    """
+    if context.is_offline_mode():
+        raise RuntimeError('batched_backfill cannot run in offline (--sql) mode')
+
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        _ensure_progress_table(bind)
+
+        last_id = bind.execute(
+            sa.text(f'SELECT last_id FROM {BACKFILL_PROGRESS_TABLE} WHERE name = :name'), {'name': name}
+        ).scalar()
+        if last_id is None:
+            last_id = bind.execute(sa.text(f'SELECT coalesce(min({key}), 0) - 1 FROM {table_name}')).scalar()
+        else:
+            logger.info(f'[{name}] resuming after {key}={last_id}')
+        max_id = bind.execute(sa.text(f'SELECT coalesce(max({key}), 0) FROM {table_name}')).scalar()
+
+        condition = f' AND ({where_clause})' if where_clause else ''
+        update_sql = sa.text(
+            f'UPDATE {table_name} SET {set_clause} WHERE {key} > :lower AND {key} <= :upper{condition}'
+        )
+        upper_sql = sa.text(
+            f'SELECT max({key}) FROM (SELECT {key} FROM {table_name} WHERE {key} > :lower '
+            f'ORDER BY {key} LIMIT :limit) AS batch'
+        )
+        progress_sql = sa.text(
+            f'INSERT INTO {BACKFILL_PROGRESS_TABLE} (name, last_id, updated_at) VALUES (:name, :last_id, now()) '
+            'ON CONFLICT (name) DO UPDATE SET last_id = excluded.last_id, updated_at = excluded.updated_at'
+        )
+
+        started = time.monotonic()
+        updated = 0
+        with lock_timeout(batch_lock_timeout_ms):
+            while True:
+                upper = bind.execute(upper_sql, {'lower': last_id, 'limit': batch_size}).scalar()
+                if upper is None:
+                    break
+                result = bind.execute(update_sql, {'lower': last_id, 'upper': upper})
+                updated += result.rowcount
+                last_id = upper
+                bind.execute(progress_sql, {'name': name, 'last_id': last_id})
+
+                elapsed = time.monotonic() - started
+                percent = min(100.0, last_id / max_id * 100) if max_id else 100.0
+                logger.info(
+                    f'[{name}] {key}<={last_id}/{max_id} ({percent:.1f}%), '
+                    f'{updated} rows updated, {updated / elapsed if elapsed else 0:.0f} rows/s'
+                )
+                if sleep:
+                    time.sleep(sleep)
+
+        bind.execute(sa.text(f'DELETE FROM {BACKFILL_PROGRESS_TABLE} WHERE name = :name'), {'name': name})
+        logger.info(f'[{name}] backfill finished: {updated} rows in {time.monotonic() - started:.1f}s')
@@ -0,0 +1,175 @@
+import cProfile
+import gzip
+import json
+import marshal
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+
+
+class RequestTimeline:
+    """记录单个请求中的SQL/Redis/HTTP调用时间线"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.events: List[Dict[str, Any]] = []
+
+    def record(self, kind: str, label: str, started: float, duration: float):
+        self.events.append({
+            'kind': kind,
+            'label': label,
+            'offset_ms': round((started - self.started) * 1000, 3),
+            'duration_ms': round(duration * 1000, 3),
+        })
+
+    def summary(self) -> Dict[str, Dict[str, float]]:
+        totals: Dict[str, Dict[str, float]] = defaultdict(lambda: {'count': 0, 'total_ms': 0.0})
+        for event in self.events:
+            totals[event['kind']]['count'] += 1
+            totals[event['kind']]['total_ms'] += event['duration_ms']
+        return dict(totals)
+
+
+_current_timeline: ContextVar[Optional[RequestTimeline]] = ContextVar('profiling_timeline', default=None)
+
+
+def record_event(kind: str, label: str, started: float, duration: float):
+    """向当前请求的时间线写入一条事件，未在分析时直接返回"""
+    timeline = _current_timeline.get()
+    if timeline is not None:
+        timeline.record(kind, label, started, duration)
+
+
+class RequestProfiler:
+    """用cProfile分析单个请求，并将结果写成压缩文件"""
+
+    # cProfile在同一时刻只能有一个实例处于启用状态
+    _lock = threading.Lock()
+
+    def __init__(self, endpoint: str):
+        self.id = uuid.uuid4().hex
+        self.endpoint = endpoint or 'unknown'
+        self.timeline = RequestTimeline()
+        self._profile = cProfile.Profile()
+        self._token = None
+        self._running = False
+
+    def start(self) -> bool:
+        """开始分析；已有请求在分析时返回False"""
+        if not self._lock.acquire(blocking=False):
+            return False
+        self._token = _current_timeline.set(self.timeline)
+        self._profile.enable()
+        self._running = True
+        return True
+
+    def stop(self):
+        if not self._running:
+            return
+        self._profile.disable()
+        _current_timeline.reset(self._token)
+        self._running = False
+        self._lock.release()
+
+    def dump(self, output_dir: str, **meta) -> str:
+        """写出 <stem>.prof.gz（pstats格式）和 <stem>.timeline.json.gz，返回文件名前缀"""
+        os.makedirs(output_dir, exist_ok=True)
+        stem = os.path.join(
+            output_dir,
+            f"{time.strftime('%Y%m%d-%H%M%S')}-{self.endpoint.replace('.', '_')}-{self.id}",
+        )
+
+        stats = pstats.Stats(self._profile)
+        with gzip.open(f'{stem}.prof.gz', 'wb') as f:
+            # 解压后可直接用 pstats.Stats(path) / snakeviz 打开
+            f.write(marshal.dumps(stats.stats))
+
+        timeline = {
+            'id': self.id,
+            'endpoint': self.endpoint,
+            'duration_ms': round((time.perf_counter() - self.timeline.started) * 1000, 3),
+            'summary': self.timeline.summary(),
+            'events': self.timeline.events,
+            **meta,
+        }
+        with gzip.open(f'{stem}.timeline.json.gz', 'wt', encoding='utf-8') as f:
+            json.dump(timeline, f, ensure_ascii=False)
+        return stem
+
+
+class StackSampler:
+    """低开销的采样分析器：后台线程定期抓取正在处理请求的线程栈，按端点聚合"""
+
+    def __init__(self, output_dir: str, interval: float, window: int, max_depth: int = 64):
+        self.output_dir = output_dir
+        self.interval = interval
+        self.window = window
+        self.max_depth = max_depth
+        self._endpoints: Dict[int, str] = {}
+        self._stacks: Dict[str, Counter] = defaultdict(Counter)
+        self._thread: Optional[threading.Thread] = None
+        self._pid: Optional[int] = None
+        self._start_lock = threading.Lock()
+
+    def enter(self, endpoint: str):
+        self._endpoints[threading.get_ident()] = endpoint or 'unknown'
+
+    def exit(self):
+        self._endpoints.pop(threading.get_ident(), None)
+
+    def ensure_started(self):
+        """确保当前进程中采样线程在运行（fork之后需要重新启动）"""
+        if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+            return
+        with self._start_lock:
+            # 加锁后再检查一次，避免多个请求线程同时启动采样线程或清掉彼此已登记的端点
+            if self._pid == os.getpid() and self._thread is not None and self._thread.is_alive():
+                return
+            if self._pid != os.getpid():
+                self._endpoints.clear()
+                self._stacks.clear()
+            self._pid = os.getpid()
+            self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+            self._thread.start()
+
+    def _collapse(self, frame) -> str:
+        names = []
+        while frame is not None and len(names) < self.max_depth:
+            code = frame.f_code
+            names.append(f'{os.path.basename(code.co_filename)}:{code.co_name}')
+            frame = frame.f_back
+        return ';'.join(reversed(names))
+
+    def _sample(self):
+        frames = sys._current_frames()
+        for thread_id, endpoint in list(self._endpoints.items()):
+            frame = frames.get(thread_id)
+            if frame is not None:
+                self._stacks[endpoint][self._collapse(frame)] += 1
+
+    def _flush(self):
+        stacks, self._stacks = self._stacks, defaultdict(Counter)
+        if not stacks:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        path = os.path.join(self.output_dir, f"stacks-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.folded.gz")
+        # flamegraph.pl / speedscope 可直接读取的折叠栈格式，端点作为栈底
+        with gzip.open(path, 'wt', encoding='utf-8') as f:
+            for endpoint, counter in stacks.items():
+                for stack, count in counter.most_common():
+                    f.write(f'{endpoint};{stack} {count}\n')
+
+    def _run(self):
+        window_started = time.monotonic()
+        while True:
+            time.sleep(self.interval)
+            self._sample()
+            if time.monotonic() - window_started >= self.window:
+                self._flush()
+                window_started = time.monotonic()
@@ -97,6 +97,18 @@ def run_migrations_online():
     connectable = get_engine()
 
     with connectable.connect() as connection:
+        # lock guard: DDL that cannot get its lock quickly fails instead of
+        # queueing behind a long transaction and blocking live traffic
+        lock_timeout = current_app.config.get('MIGRATION_LOCK_TIMEOUT')
+        if lock_timeout and connection.dialect.name == 'postgresql':
+            connection.exec_driver_sql(f"SET lock_timeout = '{int(lock_timeout)}ms'")
+            # end the autobegun transaction so alembic still manages its own
+            connection.commit()
+
+        # each migration commits on its own, so a long-running upgrade does
+        # not hold every lock it took until the very last revision is done
+        conf_args.setdefault("transaction_per_migration", True)
+
         context.configure(
             connection=connection,
             target_metadata=get_metadata(),
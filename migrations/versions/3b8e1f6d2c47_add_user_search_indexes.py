@@ -0,0 +1,36 @@
+"""add user search indexes
+
+Revision ID: 3b8e1f6d2c47
+Revises: af5f8a716a1c
+Create Date: 2026-10-19 10:12:31.406512
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from libs.migration import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = '3b8e1f6d2c47'
+down_revision = 'af5f8a716a1c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # users是大表，索引在事务之外并发构建，不阻塞写入
+    create_index_concurrently(
+        'ix_users_username_trgm',
+        'users',
+        ['username'],
+        postgresql_using='gin',
+        postgresql_ops={'username': 'gin_trgm_ops'},
+    )
+    create_index_concurrently('ix_users_created_at_id', 'users', ['created_at', 'id'])
+
+
+def downgrade():
+    drop_index_concurrently('ix_users_created_at_id', 'users')
+    drop_index_concurrently('ix_users_username_trgm', 'users')
@@ -0,0 +1,31 @@
+"""add oauth token expires at index
+
+Revision ID: e71a3c9b0d58
+Revises: 9c4d27a1e5b3
+Create Date: 2026-10-19 17:40:08.552913
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from libs.migration import create_index_concurrently, drop_index_concurrently
+
+
+# revision identifiers, used by Alembic.
+revision = 'e71a3c9b0d58'
+down_revision = '9c4d27a1e5b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    create_index_concurrently(
+        'ix_oauth_accounts_token_expires_at',
+        'oauth_accounts',
+        ['token_expires_at'],
+        postgresql_where=sa.text('refresh_token IS NOT NULL'),
+    )
+
+
+def downgrade():
+    drop_index_concurrently('ix_oauth_accounts_token_expires_at', 'oauth_accounts')
@@ -18,4 +18,6 @@ class OAuthAccount(db.Model):
     
     __table_args__ = (
         db.UniqueConstraint('provider', 'provider_user_id', name='unique_provider_user'),
+        # 令牌刷新调度：按过期时间范围扫描可刷新的账户
+        db.Index('ix_oauth_accounts_token_expires_at', 'token_expires_at', postgresql_where=db.text('refresh_token IS NOT NULL')),
     )
\ No newline at end of file
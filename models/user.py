@@ -8,6 +8,7 @@ class User(db.Model):
     email = db.Column(db.String(120), unique=True, nullable=True)
     username = db.Column(db.String(80), nullable=False)
     avatar_url = db.Column(db.String(255), nullable=True)
+    avatar_hash = db.Column(db.String(64), nullable=True)  # 本地缓存头像的内容哈希
     is_active = db.Column(db.Boolean, default=True)
     created_at = db.Column(db.DateTime, default=datetime.now(timezone.utc))
     updated_at = db.Column(db.DateTime, default=datetime.now(timezone.utc), onupdate=datetime.now(timezone.utc))
@@ -15,12 +16,19 @@ class User(db.Model):
     # 关联OAuth账户
     oauth_accounts = db.relationship('OAuthAccount', backref='user', lazy='dynamic')
     
+    __table_args__ = (
+        # 用户搜索：pg_trgm索引支撑 ILIKE '%q%'，(created_at, id) 支撑游标分页
+        db.Index('ix_users_username_trgm', 'username', postgresql_using='gin', postgresql_ops={'username': 'gin_trgm_ops'}),
+        db.Index('ix_users_created_at_id', 'created_at', 'id'),
+    )
+    
     def to_dict(self):
         return {
             'id': self.id,
             'email': self.email,
             'username': self.username,
             'avatar_url': self.avatar_url,
+            'avatar_hash': self.avatar_hash,
             'is_active': self.is_active,
             'created_at': self.created_at
         }
\ No newline at end of file
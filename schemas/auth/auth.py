@@ -19,6 +19,7 @@ class UserProfile(BaseModel):
     email: Optional[str]
     username: str
     avatar_url: Optional[str]
+    avatar_hash: Optional[str] = None
     is_active: bool
     created_at: Optional[Datetime2Timestamp]
 
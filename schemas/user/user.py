@@ -0,0 +1,37 @@
+from pydantic import BaseModel, Field, field_validator
+from typing import Dict, List, Optional
+from utils.datetime import Datetime2Timestamp
+
+class PublicUserProfile(BaseModel):
+    """展示给其他用户的公开资料，不包含邮箱"""
+    id: int
+    username: str
+    avatar_url: Optional[str]
+    avatar_hash: Optional[str] = None
+    created_at: Optional[Datetime2Timestamp]
+
+class UserBatchRequest(BaseModel):
+    ids: List[int]
+
+    @field_validator('ids', mode='before')
+    @classmethod
+    def split_ids(cls, value):
+        # 支持查询参数形式 ?ids=1,2,3
+        if isinstance(value, str):
+            return [item for item in value.split(',') if item.strip()]
+        return value
+
+class UserBatchResponse(BaseModel):
+    success: bool
+    users: Dict[int, PublicUserProfile]
+    missing: List[int]
+
+class UserSearchRequest(BaseModel):
+    q: Optional[str] = None
+    limit: Optional[int] = Field(default=None, ge=1)
+    cursor: Optional[str] = None
+
+class UserSearchResponse(BaseModel):
+    success: bool
+    users: List[PublicUserProfile]
+    next_cursor: Optional[str] = None
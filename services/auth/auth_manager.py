@@ -1,5 +1,5 @@
 import secrets
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from flask import current_app, session
 from .github import GitHubAuthProvider
 from .base import BaseAuthProvider
@@ -8,23 +8,33 @@ class AuthManager:
     """认证管理器"""
     
     def __init__(self):
-        self._providers: Dict[str, BaseAuthProvider] = {}
-        self._register_providers()
+        # 提供商实例按应用缓存，使其HTTP连接池在请求之间复用
+        providers = current_app.extensions.get('auth_providers')
+        if providers is None:
+            providers = current_app.extensions['auth_providers'] = self._register_providers()
+        self._providers: Dict[str, BaseAuthProvider] = providers
     
-    def _register_providers(self):
+    @staticmethod
+    def _register_providers() -> Dict[str, BaseAuthProvider]:
         """注册认证提供商"""
+        providers: Dict[str, BaseAuthProvider] = {}
         # GitHub
         if current_app.config.get('GITHUB_CLIENT_ID'):
             github_config = {
                 'client_id': current_app.config['GITHUB_CLIENT_ID'],
                 'client_secret': current_app.config['GITHUB_CLIENT_SECRET']
             }
-            self._providers['github'] = GitHubAuthProvider(github_config)
+            providers['github'] = GitHubAuthProvider(github_config)
+        return providers
     
     def get_provider(self, provider_name: str) -> Optional[BaseAuthProvider]:
         """获取认证提供商"""
         return self._providers.get(provider_name)
     
+    def get_all_providers(self) -> List[BaseAuthProvider]:
+        """获取所有已注册的认证提供商实例"""
+        return list(self._providers.values())
+    
     def get_available_providers(self) -> list:
         """获取可用的认证提供商列表"""
         return list(self._providers.keys())
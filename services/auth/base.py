@@ -1,13 +1,36 @@
+import requests
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional, Tuple
+from datetime import timedelta
+from typing import Dict, Any, List, Optional, Tuple
 from models.user import User
 from models.oauth import OAuthAccount
+from services.user.avatar import AvatarService
+from utils.datetime import utc_now
 
 class BaseAuthProvider(ABC):
     """OAuth认证提供商基类"""
     
+    # 需要在worker启动时预热（DNS解析 + TLS握手）的端点
+    warmup_urls: List[str] = []
+    
+    # 是否支持用刷新令牌续期；为True的提供商需要实现refresh_access_token
+    supports_refresh: bool = False
+    
     def __init__(self, config: Dict[str, Any]):
         self.config = config
+        self._http: Optional[requests.Session] = None
+    
+    @property
+    def http(self) -> requests.Session:
+        """复用连接池的HTTP会话，避免每次请求都重新握手"""
+        if self._http is None:
+            self._http = requests.Session()
+        return self._http
+    
+    def warmup(self, timeout: float) -> None:
+        """预先建立到提供商端点的连接"""
+        for url in self.warmup_urls:
+            self.http.head(url, timeout=timeout)
     
     @property
     @abstractmethod
@@ -30,6 +53,18 @@ class BaseAuthProvider(ABC):
         """获取用户信息"""
         pass
     
+    def refresh_access_token(self, refresh_token: str) -> Dict[str, Any]:
+        """用刷新令牌换取新的访问令牌，仅在supports_refresh为True时调用"""
+        raise NotImplementedError(f'{self.provider_name} does not support token refresh')
+    
+    @staticmethod
+    def get_token_expires_at(token_info: Dict[str, Any]):
+        """根据令牌响应中的expires_in计算过期时间，未返回时视为不过期"""
+        expires_in = token_info.get('expires_in')
+        if not expires_in:
+            return None
+        return utc_now() + timedelta(seconds=int(expires_in))
+    
     def create_or_update_user(self, user_info: Dict[str, Any], token_info: Dict[str, Any]) -> User:
         """创建或更新用户"""
         provider_user_id = str(user_info.get('id'))
@@ -63,6 +98,7 @@ class BaseAuthProvider(ABC):
         )
         db.session.add(user)
         db.session.flush()  # 获取user.id
+        AvatarService.schedule_fetch(user)
         return user
     
     def _create_oauth_account(self, user: User, user_info: Dict[str, Any], token_info: Dict[str, Any]) -> OAuthAccount:
@@ -76,6 +112,7 @@ class BaseAuthProvider(ABC):
             provider_username=user_info.get('login') or user_info.get('username'),
             access_token=token_info.get('access_token'),
             refresh_token=token_info.get('refresh_token'),
+            token_expires_at=self.get_token_expires_at(token_info),
             raw_data=user_info
         )
         db.session.add(oauth_account)
@@ -85,6 +122,7 @@ class BaseAuthProvider(ABC):
         """更新OAuth账户"""
         oauth_account.access_token = token_info.get('access_token')
         oauth_account.refresh_token = token_info.get('refresh_token')
+        oauth_account.token_expires_at = self.get_token_expires_at(token_info)
         oauth_account.raw_data = user_info
         oauth_account.provider_username = user_info.get('login') or user_info.get('username')
     
@@ -92,5 +130,10 @@ class BaseAuthProvider(ABC):
         """更新用户信息"""
         if not user.email and user_info.get('email'):
             user.email = user_info.get('email')
-        if user_info.get('avatar_url'):
-            user.avatar_url = user_info.get('avatar_url')
\ No newline at end of file
+        avatar_url = user_info.get('avatar_url')
+        if avatar_url and avatar_url != user.avatar_url:
+            user.avatar_url = avatar_url
+            AvatarService.schedule_fetch(user)
+        elif not user.avatar_hash:
+            # 头像地址未变但还没有本地缓存（存量用户或上次抓取失败），登录时重试
+            AvatarService.schedule_fetch(user)
\ No newline at end of file
@@ -1,4 +1,3 @@
-import requests
 from urllib.parse import urlencode
 from typing import Dict, Any
 from .base import BaseAuthProvider
@@ -6,6 +5,9 @@ from .base import BaseAuthProvider
 class GitHubAuthProvider(BaseAuthProvider):
     """GitHub OAuth认证提供商"""
     
+    warmup_urls = ['https://github.com', 'https://api.github.com']
+    supports_refresh = True
+    
     @property
     def provider_name(self) -> str:
         return 'github'
@@ -35,7 +37,7 @@ class GitHubAuthProvider(BaseAuthProvider):
             'Content-Type': 'application/x-www-form-urlencoded'
         }
         
-        response = requests.post(
+        response = self.http.post(
             'https://github.com/login/oauth/access_token',
             data=data,
             headers=headers
@@ -43,6 +45,29 @@ class GitHubAuthProvider(BaseAuthProvider):
         response.raise_for_status()
         return response.json()
     
+    def refresh_access_token(self, refresh_token: str) -> Dict[str, Any]:
+        """用刷新令牌换取新的访问令牌（仅启用了令牌过期的GitHub应用会返回刷新令牌）"""
+        data = {
+            'client_id': self.config['client_id'],
+            'client_secret': self.config['client_secret'],
+            'grant_type': 'refresh_token',
+            'refresh_token': refresh_token
+        }
+        
+        headers = {
+            'Accept': 'application/json',
+            'Content-Type': 'application/x-www-form-urlencoded'
+        }
+        
+        response = self.http.post(
+            'https://github.com/login/oauth/access_token',
+            data=data,
+            headers=headers,
+            timeout=10
+        )
+        response.raise_for_status()
+        return response.json()
+    
     def get_user_info(self, access_token: str) -> Dict[str, Any]:
         """获取GitHub用户信息"""
         headers = {
@@ -51,13 +76,13 @@ class GitHubAuthProvider(BaseAuthProvider):
         }
         
         # 获取用户基本信息
-        user_response = requests.get('https://api.github.com/user', headers=headers)
+        user_response = self.http.get('https://api.github.com/user', headers=headers)
         user_response.raise_for_status()
         user_data = user_response.json()
         
         # 获取用户邮箱（如果公开邮箱为空）
         if not user_data.get('email'):
-            emails_response = requests.get('https://api.github.com/user/emails', headers=headers)
+            emails_response = self.http.get('https://api.github.com/user/emails', headers=headers)
             if emails_response.status_code == 200:
                 emails = emails_response.json()
                 primary_email = next((email['email'] for email in emails if email['primary']), None)
@@ -0,0 +1,357 @@
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+from flask import Flask, current_app
+from redis.exceptions import LockError
+from redis.lock import Lock
+from sqlalchemy import bindparam, tuple_, update
+
+from extensions.ext_db import db
+from extensions.ext_redis import redis_client
+from models.oauth import OAuthAccount
+from utils.datetime import utc_now
+from .auth_manager import AuthManager
+from .base import BaseAuthProvider
+
+LOCK_NAME = 'token_refresh:lock'
+# 单个账户的刷新锁，调度器和请求路径的兜底刷新共用，保证一次性的刷新令牌不会被使用两次
+ACCOUNT_LOCK_NAME = 'token_refresh:account:{}'
+ACCOUNT_LOCK_TTL = 120
+# 写回失败的刷新结果暂存在这里，下一轮调度时重新写入
+UNSAVED_KEY = 'token_refresh:unsaved'
+# 每凑够这么多个刷新结果就写回一次，崩溃时最多丢失一个小批次
+WRITE_CHUNK_SIZE = 20
+# 调度锁续期间隔（秒），与是否有结果写回无关
+KEEPALIVE_INTERVAL = 10
+
+
+class TerminalRefreshError(Exception):
+    """提供商明确拒绝了刷新令牌（如bad_refresh_token），重试也不会成功"""
+
+
+# 写回时只更新刷新令牌仍是本次所消耗令牌的行：期间用户重新登录写入的新令牌不会被覆盖
+_GUARDED_UPDATE = update(OAuthAccount.__table__).where(
+    OAuthAccount.__table__.c.id == bindparam('b_id'),
+    OAuthAccount.__table__.c.refresh_token == bindparam('b_consumed_refresh_token'),
+).values(
+    access_token=bindparam('b_access_token'),
+    refresh_token=bindparam('b_refresh_token'),
+    token_expires_at=bindparam('b_token_expires_at'),
+    updated_at=bindparam('b_updated_at'),
+)
+_GUARDED_CLEAR = update(OAuthAccount.__table__).where(
+    OAuthAccount.__table__.c.id == bindparam('b_id'),
+    OAuthAccount.__table__.c.refresh_token == bindparam('b_consumed_refresh_token'),
+).values(
+    refresh_token=None,
+    updated_at=bindparam('b_updated_at'),
+)
+
+
+class RateLimiter:
+    """线程安全的匀速限流器，保证请求间隔不小于 1/rate 秒"""
+
+    def __init__(self, rate: float):
+        self._interval = 1.0 / rate if rate > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self):
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next - now
+            self._next = max(now, self._next) + self._interval
+        if wait > 0:
+            time.sleep(wait)
+
+
+def _account_lock(account_id: int) -> Lock:
+    # 锁在工作线程中获取、在主线程中释放，不能使用线程本地的令牌
+    return redis_client.lock(ACCOUNT_LOCK_NAME.format(account_id), timeout=ACCOUNT_LOCK_TTL, thread_local=False)
+
+
+def _release(lock: Lock):
+    try:
+        lock.release()
+    except LockError:
+        # 锁已过期或被其他进程获取，无需处理
+        pass
+
+
+class TokenRefreshService:
+    """OAuth令牌刷新服务：在令牌过期前批量刷新，请求处理路径只读取已刷新的令牌"""
+
+    @staticmethod
+    def get_valid_access_token(oauth_account: OAuthAccount) -> Optional[str]:
+        """获取有效的访问令牌；调度器正常运行时不会触发刷新，仅在其落后时兜底同步刷新"""
+        if not oauth_account.token_expires_at or oauth_account.token_expires_at > utc_now():
+            return oauth_account.access_token
+
+        provider = AuthManager().get_provider(oauth_account.provider)
+        if not provider or not provider.supports_refresh or not oauth_account.refresh_token:
+            return None
+
+        lock = _account_lock(oauth_account.id)
+        if not lock.acquire(blocking=True, blocking_timeout=10):
+            return None
+        try:
+            # 拿到锁后重新读取，调度器或其他请求可能已经完成了刷新
+            db.session.refresh(oauth_account)
+            if not oauth_account.token_expires_at or oauth_account.token_expires_at > utc_now():
+                return oauth_account.access_token
+            if not oauth_account.refresh_token:
+                return None
+
+            try:
+                token_info = provider.refresh_access_token(oauth_account.refresh_token)
+            except requests.RequestException as e:
+                current_app.logger.warning(f'刷新令牌失败 oauth_account_id={oauth_account.id}: {str(e)}')
+                return None
+            if 'error' in token_info:
+                current_app.logger.warning(
+                    f'刷新令牌失败 oauth_account_id={oauth_account.id}: {token_info.get("error_description", token_info["error"])}'
+                )
+                # 刷新令牌已失效，清除后调度器不再选中该账户，等待用户重新登录
+                oauth_account.refresh_token = None
+                db.session.commit()
+                return None
+            oauth_account.access_token = token_info['access_token']
+            oauth_account.refresh_token = token_info.get('refresh_token') or oauth_account.refresh_token
+            oauth_account.token_expires_at = provider.get_token_expires_at(token_info)
+            db.session.commit()
+            return oauth_account.access_token
+        finally:
+            _release(lock)
+
+    @staticmethod
+    def _refresh_one(
+        app: Flask, provider: BaseAuthProvider, limiter: RateLimiter, account_id: int, refresh_token: str
+    ) -> Optional[Tuple[Dict[str, Any], Lock]]:
+        """在工作线程中刷新单个账户，返回待写回的字段和账户锁（写回后再释放）；账户正被其他地方刷新时返回None"""
+        lock = _account_lock(account_id)
+        if not lock.acquire(blocking=False):
+            return None
+        try:
+            with app.app_context():
+                # 批量查询之后令牌可能已被请求路径刷新，使用旧的刷新令牌会失败
+                current_refresh_token = db.session.query(OAuthAccount.refresh_token).filter_by(id=account_id).scalar()
+            if current_refresh_token != refresh_token:
+                _release(lock)
+                return None
+
+            limiter.wait()
+            token_info = provider.refresh_access_token(refresh_token)
+            if 'error' in token_info:
+                raise TerminalRefreshError(token_info.get('error_description', token_info['error']))
+        except Exception:
+            _release(lock)
+            raise
+
+        return {
+            'id': account_id,
+            'consumed_refresh_token': refresh_token,
+            'access_token': token_info['access_token'],
+            'refresh_token': token_info.get('refresh_token') or refresh_token,
+            'token_expires_at': provider.get_token_expires_at(token_info),
+            'updated_at': utc_now(),
+        }, lock
+
+    @staticmethod
+    def _execute_guarded(statement, items: List[Dict[str, Any]]):
+        db.session.execute(statement, [{f'b_{key}': value for key, value in item.items()} for item in items])
+        db.session.commit()
+
+    @classmethod
+    def _write_back(cls, updates: List[Dict[str, Any]]) -> bool:
+        """按主键批量写回；失败时把结果暂存到Redis，避免已经消耗掉旧刷新令牌的结果丢失"""
+        try:
+            cls._execute_guarded(_GUARDED_UPDATE, updates)
+            return True
+        except Exception as e:
+            db.session.rollback()
+            account_ids = [item['id'] for item in updates]
+            current_app.logger.error(f'令牌写回失败 oauth_account_ids={account_ids}: {str(e)}')
+            try:
+                redis_client.hset(UNSAVED_KEY, mapping={
+                    item['id']: json.dumps(item, default=lambda value: value.isoformat())
+                    for item in updates
+                })
+            except Exception as e:
+                current_app.logger.critical(f'令牌暂存失败，以下账户需要重新授权 oauth_account_ids={account_ids}: {str(e)}')
+            return False
+
+    @classmethod
+    def _clear_dead_tokens(cls, account_refresh_tokens: Dict[int, str]):
+        """清除被提供商拒绝的刷新令牌，使这些账户离开调度器的扫描范围"""
+        try:
+            cls._execute_guarded(_GUARDED_CLEAR, [
+                {'id': account_id, 'consumed_refresh_token': refresh_token, 'updated_at': utc_now()}
+                for account_id, refresh_token in account_refresh_tokens.items()
+            ])
+        except Exception as e:
+            db.session.rollback()
+            current_app.logger.error(f'清除失效刷新令牌失败 oauth_account_ids={list(account_refresh_tokens)}: {str(e)}')
+
+    @classmethod
+    def _write_back_unsaved(cls):
+        """重新写入之前写回失败而暂存的刷新结果；刷新令牌已被替换（如用户重新登录）的条目不会生效，直接丢弃"""
+        stashed = redis_client.hgetall(UNSAVED_KEY)
+        if not stashed:
+            return
+        updates = []
+        for value in stashed.values():
+            item = json.loads(value)
+            for field in ('token_expires_at', 'updated_at'):
+                if item.get(field):
+                    item[field] = datetime.fromisoformat(item[field])
+            updates.append(item)
+        if cls._write_back(updates):
+            redis_client.hdel(UNSAVED_KEY, *stashed.keys())
+
+    @classmethod
+    def refresh_expiring(cls, keepalive: Optional[Callable[[], bool]] = None) -> int:
+        """刷新即将过期的令牌，返回成功刷新的账户数
+
+        keepalive 在处理过程中每隔 KEEPALIVE_INTERVAL 秒调用一次，用于续期调度锁；
+        返回False表示锁已丢失，此时不再发起新的刷新，只写回已经完成的结果。
+        """
+        cls._write_back_unsaved()
+
+        app = current_app._get_current_object()
+        config = current_app.config
+        batch_size = config['TOKEN_REFRESH_BATCH_SIZE']
+        providers = {
+            provider.provider_name: provider
+            for provider in AuthManager().get_all_providers()
+            if provider.supports_refresh
+        }
+        if not providers:
+            return 0
+        limiter = RateLimiter(config['TOKEN_REFRESH_RATE_LIMIT'])
+
+        now = utc_now()
+        deadline = now + timedelta(seconds=config['TOKEN_REFRESH_AHEAD'])
+        # 过期太久的账户不再由调度器处理（使用时兜底刷新），避免它们永远排在扫描的最前面
+        cursor = (now - timedelta(seconds=config['TOKEN_REFRESH_MAX_OVERDUE']), 0)
+
+        refreshed = failed = 0
+        lock_lost = False
+        last_keepalive = time.monotonic()
+
+        def check_lock(futures):
+            nonlocal lock_lost, last_keepalive
+            if not keepalive or lock_lost or time.monotonic() - last_keepalive < KEEPALIVE_INTERVAL:
+                return
+            last_keepalive = time.monotonic()
+            if not keepalive():
+                lock_lost = True
+                # 尚未开始的刷新直接取消，已经在进行的仍需等待并写回
+                for pending in futures:
+                    pending.cancel()
+                current_app.logger.warning('令牌刷新调度锁已丢失，停止发起新的刷新')
+
+        with ThreadPoolExecutor(max_workers=config['TOKEN_REFRESH_WORKERS'], thread_name_prefix='token-refresh') as executor:
+            while not lock_lost:
+                # 按 (token_expires_at, id) 游标分页，走 ix_oauth_accounts_token_expires_at 部分索引的范围扫描
+                accounts = db.session.query(
+                    OAuthAccount.id, OAuthAccount.provider, OAuthAccount.refresh_token, OAuthAccount.token_expires_at
+                ).filter(
+                    OAuthAccount.refresh_token.isnot(None),
+                    OAuthAccount.token_expires_at <= deadline,
+                    # 冗余的单列下界，让范围扫描能用上单列索引，行比较只负责同一时间点内按id翻页
+                    OAuthAccount.token_expires_at >= cursor[0],
+                    tuple_(OAuthAccount.token_expires_at, OAuthAccount.id) > cursor,
+                    OAuthAccount.provider.in_(list(providers)),
+                ).order_by(OAuthAccount.token_expires_at, OAuthAccount.id).limit(batch_size).all()
+                db.session.rollback()
+                if not accounts:
+                    break
+                cursor = (accounts[-1].token_expires_at, accounts[-1].id)
+
+                futures = {
+                    executor.submit(
+                        cls._refresh_one, app, providers[account.provider], limiter, account.id, account.refresh_token
+                    ): account
+                    for account in accounts
+                }
+
+                chunk: List[Tuple[Dict[str, Any], Lock]] = []
+                dead: Dict[int, str] = {}
+
+                def flush():
+                    nonlocal refreshed
+                    if not chunk:
+                        return
+                    if cls._write_back([item for item, _ in chunk]):
+                        refreshed += len(chunk)
+                    for _, account_lock in chunk:
+                        _release(account_lock)
+                    chunk.clear()
+
+                for future in as_completed(futures):
+                    if not future.cancelled():
+                        account = futures[future]
+                        try:
+                            result = future.result()
+                        except TerminalRefreshError as e:
+                            failed += 1
+                            dead[account.id] = account.refresh_token
+                            current_app.logger.warning(f'刷新令牌已失效 oauth_account_id={account.id}: {str(e)}')
+                        except Exception as e:
+                            failed += 1
+                            current_app.logger.warning(f'刷新令牌失败 oauth_account_id={account.id}: {str(e)}')
+                        else:
+                            if result is not None:
+                                chunk.append(result)
+                            if len(chunk) >= WRITE_CHUNK_SIZE:
+                                flush()
+                    check_lock(futures)
+                flush()
+                if dead:
+                    cls._clear_dead_tokens(dead)
+
+                if len(accounts) < batch_size:
+                    break
+
+        if refreshed or failed:
+            current_app.logger.info(f'令牌刷新完成: 成功{refreshed}个, 失败{failed}个')
+        return refreshed
+
+    @classmethod
+    def run_once(cls) -> Optional[int]:
+        """在分布式锁保护下执行一次刷新，锁被其他进程持有时返回None"""
+        interval = current_app.config['TOKEN_REFRESH_INTERVAL']
+        lock = redis_client.lock(LOCK_NAME, timeout=max(interval * 5, 300))
+        if not lock.acquire(blocking=False):
+            return None
+
+        def keepalive() -> bool:
+            # 每次写回后把锁的有效期重置为完整的timeout
+            try:
+                lock.reacquire()
+                return True
+            except LockError:
+                return False
+
+        try:
+            return cls.refresh_expiring(keepalive)
+        finally:
+            _release(lock)
+
+    @classmethod
+    def run_forever(cls):
+        """按固定间隔循环执行刷新"""
+        interval = current_app.config['TOKEN_REFRESH_INTERVAL']
+        while True:
+            started = time.monotonic()
+            try:
+                cls.run_once()
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.error(f'令牌刷新调度失败: {str(e)}')
+            time.sleep(max(0.0, interval - (time.monotonic() - started)))
@@ -0,0 +1,153 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from urllib.parse import urlparse
+
+import requests
+from flask import Flask, current_app
+from PIL import Image, ImageOps
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from extensions.ext_db import db
+from models.user import User
+
+PENDING_KEY = 'pending_avatar_fetches'
+
+
+class AvatarService:
+    """头像本地缓存服务：抓取提供商头像，生成缩略图并按内容哈希存储"""
+
+    _executor: Optional[ThreadPoolExecutor] = None
+    _executor_pid: Optional[int] = None
+    _executor_lock = threading.Lock()
+    _http: Optional[requests.Session] = None
+    _http_pid: Optional[int] = None
+
+    @staticmethod
+    def thumbnail_path(storage_dir: str, avatar_hash: str, size: int) -> str:
+        """缩略图在本地的存储路径：<root>/<哈希前两位>/<哈希>/<尺寸>.webp"""
+        return os.path.join(storage_dir, avatar_hash[:2], avatar_hash, f'{size}.webp')
+
+    @staticmethod
+    def schedule_fetch(user: User):
+        """登记头像抓取任务，在当前事务提交之后于后台执行"""
+        if not current_app.config['AVATAR_CACHE_ENABLED'] or not user.avatar_url:
+            return
+        # 提交后用户对象会过期，这里直接记录ID和地址
+        db.session.info.setdefault(PENDING_KEY, []).append((user.id, user.avatar_url))
+
+    @classmethod
+    def _get_executor(cls, workers: int) -> ThreadPoolExecutor:
+        # 线程池不能跨fork复用，按进程创建
+        with cls._executor_lock:
+            if cls._executor is None or cls._executor_pid != os.getpid():
+                cls._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='avatar-fetch')
+                cls._executor_pid = os.getpid()
+            return cls._executor
+
+    @classmethod
+    def _get_http(cls) -> requests.Session:
+        # urllib3连接池不检查pid，跨fork共享会让多个进程读写同一个连接，按进程创建
+        with cls._executor_lock:
+            if cls._http is None or cls._http_pid != os.getpid():
+                cls._http = requests.Session()
+                cls._http_pid = os.getpid()
+            return cls._http
+
+    @classmethod
+    def submit(cls, app: Flask, user_id: int, url: str):
+        executor = cls._get_executor(app.config['AVATAR_FETCH_WORKERS'])
+        executor.submit(cls.process, app, user_id, url)
+
+    @classmethod
+    def process(cls, app: Flask, user_id: int, url: str):
+        with app.app_context():
+            try:
+                avatar_hash = cls.fetch_and_store(url)
+                # 只在头像地址未再次变化时写回，避免覆盖更新的结果
+                User.query.filter_by(id=user_id, avatar_url=url).update({'avatar_hash': avatar_hash})
+                db.session.commit()
+            except Exception as e:
+                db.session.rollback()
+                current_app.logger.warning(f'头像缓存失败 user_id={user_id}: {str(e)}')
+            finally:
+                db.session.remove()
+
+    @classmethod
+    def fetch_and_store(cls, url: str) -> str:
+        """抓取头像并生成各尺寸缩略图，返回原图内容哈希"""
+        config = current_app.config
+        parsed = urlparse(url)
+        if parsed.scheme not in ('http', 'https') or parsed.hostname not in config['AVATAR_ALLOWED_HOSTS']:
+            raise ValueError(f'不允许的头像地址: {url}')
+
+        content = cls._download(url, config['AVATAR_FETCH_TIMEOUT'], config['AVATAR_MAX_BYTES'])
+        avatar_hash = hashlib.sha256(content).hexdigest()
+
+        storage_dir = config['AVATAR_STORAGE_DIR']
+        missing_sizes = [
+            size for size in config['AVATAR_SIZES']
+            if not os.path.exists(cls.thumbnail_path(storage_dir, avatar_hash, size))
+        ]
+        if not missing_sizes:
+            return avatar_hash
+
+        with Image.open(io.BytesIO(content)) as image:
+            # Image.open只解析文件头，在解码像素之前拦截高压缩比的超大图片
+            width, height = image.size
+            if width * height > config['AVATAR_MAX_PIXELS']:
+                raise ValueError(f'头像尺寸过大: {width}x{height}')
+            image = ImageOps.exif_transpose(image)
+            image = image.convert('RGBA' if image.mode in ('RGBA', 'LA', 'P') else 'RGB')
+            for size in missing_sizes:
+                thumbnail = ImageOps.fit(image, (size, size), Image.Resampling.LANCZOS)
+                cls._atomic_save(thumbnail, cls.thumbnail_path(storage_dir, avatar_hash, size))
+        return avatar_hash
+
+    @classmethod
+    def _download(cls, url: str, timeout: float, max_bytes: int) -> bytes:
+        # 不跟随重定向：白名单只校验了初始地址，重定向可能指向任意主机
+        with cls._get_http().get(url, timeout=timeout, stream=True, allow_redirects=False) as response:
+            if response.is_redirect:
+                raise ValueError(f'头像地址发生重定向: {url}')
+            response.raise_for_status()
+            chunks, total = [], 0
+            for chunk in response.iter_content(chunk_size=64 * 1024):
+                total += len(chunk)
+                if total > max_bytes:
+                    raise ValueError(f'头像超过大小限制: {max_bytes} bytes')
+                chunks.append(chunk)
+        return b''.join(chunks)
+
+    @staticmethod
+    def _atomic_save(image: Image.Image, path: str):
+        # 先写临时文件再rename，并发生成同一缩略图时读者不会看到半写入的文件
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                image.save(f, format='WEBP', quality=85, method=6)
+            os.replace(tmp_path, path)
+        except Exception:
+            os.unlink(tmp_path)
+            raise
+
+
+@event.listens_for(Session, 'after_commit')
+def _submit_pending_fetches(session: Session):
+    pending = session.info.pop(PENDING_KEY, None)
+    if not pending:
+        return
+    app = current_app._get_current_object()
+    for user_id, url in pending:
+        AvatarService.submit(app, user_id, url)
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_pending_fetches(session: Session):
+    session.info.pop(PENDING_KEY, None)
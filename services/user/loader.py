@@ -0,0 +1,40 @@
+from typing import Dict, Iterable, List, Optional
+from flask import g
+from models.user import User
+
+
+class UserLoader:
+    """请求级别的用户批量加载器
+
+    同一请求内对用户的多次查询会被合并：重复ID只查一次，已加载（包括不存在）的ID直接命中缓存，
+    未加载的ID通过一条 IN 查询批量获取。
+    """
+    
+    CHUNK_SIZE = 500
+    
+    def __init__(self):
+        self._cache: Dict[int, Optional[User]] = {}
+    
+    @classmethod
+    def current(cls) -> 'UserLoader':
+        """获取当前请求的加载器"""
+        if 'user_loader' not in g:
+            g.user_loader = cls()
+        return g.user_loader
+    
+    def load(self, user_id: int) -> Optional[User]:
+        """加载单个用户"""
+        return self.load_many([user_id])[user_id]
+    
+    def load_many(self, user_ids: Iterable[int]) -> Dict[int, Optional[User]]:
+        """批量加载用户，返回按ID索引的结果，不存在的用户为None"""
+        unique_ids: List[int] = list(dict.fromkeys(user_ids))
+        pending = [user_id for user_id in unique_ids if user_id not in self._cache]
+        
+        for start in range(0, len(pending), self.CHUNK_SIZE):
+            chunk = pending[start:start + self.CHUNK_SIZE]
+            found = {user.id: user for user in User.query.filter(User.id.in_(chunk)).all()}
+            for user_id in chunk:
+                self._cache[user_id] = found.get(user_id)
+        
+        return {user_id: self._cache[user_id] for user_id in unique_ids}
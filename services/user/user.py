@@ -1,6 +1,9 @@
-from typing import Optional
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import tuple_
 from models.user import User
 from services.auth.auth_manager import AuthManager
+from .loader import UserLoader
 
 class UserService:
     """用户服务"""
@@ -10,6 +13,28 @@ class UserService:
         """根据ID获取用户"""
         return User.query.get(user_id)
     
+    @staticmethod
+    def get_users_by_ids(user_ids: Iterable[int]) -> Dict[int, Optional[User]]:
+        """根据ID批量获取用户，同一请求内的重复ID会被合并，不存在的用户为None"""
+        return UserLoader.current().load_many(user_ids)
+    
+    @staticmethod
+    def search_users(query: Optional[str], limit: int, after: Optional[Tuple[datetime, int]] = None) -> Tuple[List[User], bool]:
+        """搜索/列出用户，按 (created_at, id) 倒序游标分页，返回本页用户以及是否还有下一页"""
+        user_query = User.query.filter(User.is_active.is_(True), User.created_at.isnot(None))
+        
+        if query:
+            # 只按用户名匹配，不允许通过邮箱片段枚举用户
+            escaped = query.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+            user_query = user_query.filter(User.username.ilike(f'%{escaped}%', escape='\\'))
+        
+        if after:
+            user_query = user_query.filter(tuple_(User.created_at, User.id) < after)
+        
+        # 多取一条用于判断是否还有下一页
+        users = user_query.order_by(User.created_at.desc(), User.id.desc()).limit(limit + 1).all()
+        return users[:limit], len(users) > limit
+    
     @staticmethod
     def get_current_user() -> Optional[User]:
         """获取当前登录用户"""
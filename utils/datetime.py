@@ -1,5 +1,5 @@
 from pydantic import WrapSerializer
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Annotated, Any
 
 
@@ -8,3 +8,8 @@ def convert_to_timestamp(value: Any, handler) -> int:
 
 
 Datetime2Timestamp = Annotated[datetime, WrapSerializer(convert_to_timestamp)]
+
+
+def utc_now() -> datetime:
+    """当前UTC时间（naive），用于与不带时区的DateTime列比较"""
+    return datetime.now(timezone.utc).replace(tzinfo=None)